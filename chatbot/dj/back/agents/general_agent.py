@@ -1,6 +1,6 @@
 import os
+import pathlib
 from typing import Dict, List, Any
-import aiofiles
 
 from langchain_google_vertexai import ChatVertexAI
 from dotenv import load_dotenv
@@ -24,6 +24,10 @@ _mcp_tools_cache = None
 
 langfuse_handler = CallbackHandler(public_key="", secret_key="", host="")
 
+# 프롬프트 템플릿은 요청마다 파일을 열지 않도록 모듈 로드 시 한 번만 읽음
+PROMPT_PATH = os.path.join(os.path.dirname(__file__), "../prompts/general_agent.txt")
+PROMPT_TEMPLATE = pathlib.Path(PROMPT_PATH).read_text(encoding="utf-8")
+
 # MCP 서버 URL 설정
 MCP_SERVERS = {
     # "github": {
@@ -151,14 +155,8 @@ async def generate_prompt() -> str:
         print(f"도구 정보 가져오기 중 오류 발생: {str(e)}")
         tools_text = "도구 정보를 가져오는 중 오류가 발생했습니다. MCP 서버 연결을 확인하세요."
     
-    prompt_path = os.path.join(
-        os.path.dirname(__file__), "../prompts/research_agent.txt"
-    )
-    async with aiofiles.open(prompt_path, mode="r", encoding="utf-8") as f:
-        prompt_template = await f.read()
-    
     # 단순 문자열 대체 사용
-    prompt = prompt_template.replace("{tools}", tools_text)
+    prompt = PROMPT_TEMPLATE.replace("{tools}", tools_text)
     
     return prompt
 
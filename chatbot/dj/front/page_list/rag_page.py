@@ -4,17 +4,22 @@ import datetime
 import streamlit as st
 import re
 import subprocess
+import tempfile
 from pathlib import Path
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from utils.logging_config import setup_logger
 
 # 로거 설정
 logger = setup_logger(__name__)
 
+# front 디렉토리 경로 (모듈 로드 시 한 번만 계산)
+BASE_DIR = Path(__file__).resolve().parent.parent
 # RAG 저장소 경로 설정
-RAG_STORE_DIR = Path("/Users/idongju/dev/dev-tool-with-llm/chatbot/dj/front/rag_store")
+RAG_STORE_DIR = BASE_DIR / "rag_store"
 # RAG 유틸리티 경로 설정
-RAG_UTILS_DIR = Path("/Users/idongju/dev/dev-tool-with-llm/chatbot/dj/front/rag_utils")
+RAG_UTILS_DIR = BASE_DIR / "rag_utils"
+# 메타데이터 파일 경로
+METADATA_FILE = RAG_STORE_DIR / "metadata.json"
 
 # 지원되는 파일 형식
 SUPPORTED_FILE_FORMATS = {
@@ -23,43 +28,76 @@ SUPPORTED_FILE_FORMATS = {
     "PDF 파일 (*.pdf)": "pdf",  # PDF 지원 추가
 }
 
+# 업로드 미리보기를 표시할 최대 파일 크기 (이보다 크면 디코딩하지 않음)
+MAX_PREVIEW_SIZE = 2 * 1024 * 1024
+
 # 기본 컬렉션 이름 (사용자 입력이 없을 경우에만 사용)
 DEFAULT_COLLECTION_NAME = "dev_tool"
 
+# 세션 상태 기본값
+SESSION_DEFAULTS = {
+    "collection_name": "",
+    "description": "",
+    "selected_format": next(iter(SUPPORTED_FILE_FORMATS.keys())),
+    "selected_document": None,
+    "convert_to_md": False,
+    "rag_collection_name": "",  # 빈 값으로 초기화하여 사용자 입력 유도
+}
+
+@st.cache_resource(show_spinner=False)
 def initialize_rag_store():
-    """RAG 저장소 디렉토리 초기화"""
+    """RAG 저장소 디렉토리 초기화 (프로세스당 한 번만 실행, rerun마다 파일시스템을 확인하지 않음)"""
     if not RAG_STORE_DIR.exists():
         RAG_STORE_DIR.mkdir(parents=True, exist_ok=True)
         logger.info(f"RAG 저장소 디렉토리 생성: {RAG_STORE_DIR}")
     
     # 메타데이터 파일이 없으면 생성
-    metadata_file = RAG_STORE_DIR / "metadata.json"
-    if not metadata_file.exists():
-        with open(metadata_file, "w", encoding="utf-8") as f:
+    if not METADATA_FILE.exists():
+        with open(METADATA_FILE, "w", encoding="utf-8") as f:
             json.dump([], f, ensure_ascii=False, indent=2)
-        logger.info(f"메타데이터 파일 생성: {metadata_file}")
+        logger.info(f"메타데이터 파일 생성: {METADATA_FILE}")
+
+def _parse_metadata(metadata_path):
+    """메타데이터 파일 파싱 (캐시 없이 항상 파일에서 읽음)"""
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except json.JSONDecodeError:
+        logger.error("메타데이터 파일 읽기 오류, 새로운 메타데이터 생성")
+        return []
+
+@st.cache_data(show_spinner=False)
+def _read_metadata(metadata_path, file_key):
+    """메타데이터 파일 파싱 (파일 수정 시각/크기/inode를 캐시 키로 사용)"""
+    return _parse_metadata(metadata_path)
 
 def load_metadata():
     """메타데이터 파일 로드"""
-    metadata_file = RAG_STORE_DIR / "metadata.json"
-    if metadata_file.exists():
-        try:
-            with open(metadata_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            logger.error("메타데이터 파일 읽기 오류, 새로운 메타데이터 생성")
-            return []
-    return []
+    try:
+        stat = METADATA_FILE.stat()
+    except FileNotFoundError:
+        return []
+    # 파일이 바뀌지 않았다면 rerun마다 다시 읽지 않고 캐시된 결과를 사용
+    # (타임스탬프 해상도가 낮은 파일시스템에서는 같은 틱에 두 번 저장하면 mtime이 같을 수 있음.
+    #  save_metadata는 os.replace로 새 파일을 바꿔 넣으므로 크기와 inode도 함께 비교)
+    file_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return _read_metadata(str(METADATA_FILE), file_key)
 
 def save_metadata(metadata):
     """메타데이터 파일 저장"""
-    metadata_file = RAG_STORE_DIR / "metadata.json"
-    with open(metadata_file, "w", encoding="utf-8") as f:
+    # 임시 파일에 다 쓴 뒤 교체하여, 저장 도중(백그라운드 RAG 작업 포함)에 읽어도 잘린 JSON을 보지 않도록 함
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=RAG_STORE_DIR, suffix=".tmp", delete=False
+    ) as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
+    os.replace(f.name, METADATA_FILE)
     logger.info("메타데이터 저장 완료")
 
+@st.cache_data(show_spinner=False, max_entries=16)
 def convert_to_markdown(text):
-    """텍스트를 마크다운 형식으로 변환"""
+    """텍스트를 마크다운 형식으로 변환 (같은 내용은 해시로 캐시된 결과 사용)"""
     lines = text.split('\n')
     md_lines = []
     
@@ -131,8 +169,8 @@ def save_uploaded_file(uploaded_file, collection_name, description="", convert_m
     # 파일 확장자 추출
     file_ext = Path(uploaded_file.name).suffix.lstrip('.').lower()
     
-    # 현재 시간으로 파일명 생성
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 현재 시간으로 파일명 생성 (같은 초에 업로드된 파일이 덮어쓰이지 않도록 마이크로초까지 포함)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     filename = f"{collection_name}_{timestamp}.{file_ext}"
     file_path = RAG_STORE_DIR / filename
     
@@ -144,8 +182,8 @@ def save_uploaded_file(uploaded_file, collection_name, description="", convert_m
     md_file_path = None
     if convert_md and file_ext == 'txt':
         try:
-            # 텍스트 파일 내용 읽기
-            content = uploaded_file.getvalue().decode('utf-8', errors='replace')
+            # 텍스트 파일 내용 읽기 (getvalue()의 전체 bytes 복사 없이 버퍼에서 바로 디코딩)
+            content = str(uploaded_file.getbuffer(), 'utf-8', errors='replace')
             
             # 마크다운으로 변환
             md_content = convert_to_markdown(content)
@@ -216,19 +254,69 @@ def delete_document(document_id):
     
     return False
 
-def create_rag(document_id, rag_collection_name):
-    """선택한 문서에 대한 RAG 임베딩 생성"""
+def run_embedding_process(embedding_cmd, script_source=None):
+    """임베딩 스크립트를 실행하고 (반환 코드, stderr 라인 목록)을 반환
+
+    script_source가 주어지면 stdin으로 전달 (embedding_cmd는 "python -" 형태여야 함)
+    """
+    process = subprocess.Popen(
+        embedding_cmd,
+        stdin=subprocess.PIPE if script_source is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1
+    )
+
+    # 인터프리터는 stdin을 끝까지 읽은 뒤 실행을 시작하므로 먼저 모두 쓰고 닫음
+    # (소스 코드는 로케일과 관계없이 UTF-8로 해석되므로 UTF-8 바이트로 전달)
+    if script_source is not None:
+        process.stdin.buffer.write(script_source.encode("utf-8"))
+        process.stdin.close()
+
+    # stderr는 별도 스레드에서 동시에 읽음
+    # (stdout을 끝까지 읽는 동안 stderr 파이프가 가득 차 자식 프로세스가 멈추는 것을 방지)
+    def drain_stderr():
+        lines = []
+        for line in process.stderr:
+            logger.error(f"임베딩 오류: {line.strip()}")
+            lines.append(line)
+        return lines
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stderr_future = executor.submit(drain_stderr)
+
+        # 실시간으로 출력 로깅
+        for line in process.stdout:
+            logger.info(f"임베딩 출력: {line.strip()}")
+
+        stderr_lines = stderr_future.result()
+
+    # 프로세스 종료 대기
+    return_code = process.wait()
+    return return_code, stderr_lines
+
+@st.cache_resource
+def get_rag_executor():
+    """RAG 임베딩 작업용 백그라운드 스레드 풀 (임베딩은 한 번에 하나씩 실행)"""
+    return ThreadPoolExecutor(max_workers=1)
+
+@st.fragment(run_every=2)
+def render_rag_job_status():
+    """RAG 작업 진행 상태 표시 (이 영역만 2초마다 다시 그리고, 작업이 끝나면 페이지 전체를 한 번 rerun)"""
+    rag_job = st.session_state.get("rag_job")
+    if rag_job is None or rag_job["future"].done():
+        st.rerun()
+    st.info(f"RAG 임베딩 생성 중... (컬렉션: {rag_job['collection_name']}) 이 작업은 몇 분 정도 소요될 수 있습니다.")
+
+def create_rag(document_id, file_path, file_format, rag_collection_name):
+    """선택한 문서에 대한 RAG 임베딩 생성
+
+    백그라운드 스레드에서 실행되므로 st.* / st.cache_data 함수는 호출하지 않고,
+    필요한 문서 정보는 메인 스크립트에서 값으로 넘겨받음
+    """
     try:
-        # 문서 메타데이터 불러오기
-        metadata = load_metadata()
-        doc = next((d for d in metadata if d["id"] == document_id), None)
-        
-        if not doc:
-            logger.error(f"문서 ID {document_id}를 찾을 수 없습니다.")
-            return False
-        
-        file_path = doc["file_path"]
-        file_format = doc["file_format"].lower()
+        file_format = file_format.lower()
         
         # 항상 사용자가 입력한 컬렉션 이름 사용
         collection_name = rag_collection_name if rag_collection_name else DEFAULT_COLLECTION_NAME
@@ -263,27 +351,7 @@ def create_rag(document_id, rag_collection_name):
                 ]
                 logger.info(f"텍스트 임베딩 명령 실행: {' '.join(embedding_cmd)}")
                 
-                process = subprocess.Popen(
-                    embedding_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-                
-                # 실시간으로 출력 로깅
-                stdout_lines = []
-                stderr_lines = []
-                for line in process.stdout:
-                    logger.info(f"임베딩 출력: {line.strip()}")
-                    stdout_lines.append(line)
-                
-                for line in process.stderr:
-                    logger.error(f"임베딩 오류: {line.strip()}")
-                    stderr_lines.append(line)
-                
-                # 프로세스 종료 대기
-                return_code = process.wait()
+                return_code, stderr_lines = run_embedding_process(embedding_cmd)
                 
                 if return_code != 0:
                     logger.error(f"텍스트 임베딩 실패. 반환 코드: {return_code}")
@@ -321,44 +389,15 @@ def create_rag(document_id, rag_collection_name):
                     md_script
                 )
                 
-                # 수정된 스크립트를 임시 파일로 저장
-                temp_script_path = RAG_UTILS_DIR / "temp_push_md.py"
-                with open(temp_script_path, 'w', encoding='utf-8') as f:
-                    f.write(md_script)
-                
-                # 스크립트 실행
+                # 수정된 스크립트는 임시 파일에 쓰지 않고 stdin으로 바로 전달 (디스크 쓰기 후 재읽기 생략)
                 embedding_cmd = [
                     "python",
-                    str(temp_script_path)
+                    "-"
                 ]
                 
-                logger.info(f"마크다운 임베딩 명령 실행: {' '.join(embedding_cmd)}")
-                
-                process = subprocess.Popen(
-                    embedding_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-                
-                # 실시간으로 출력 로깅
-                stdout_lines = []
-                stderr_lines = []
-                for line in process.stdout:
-                    logger.info(f"임베딩 출력: {line.strip()}")
-                    stdout_lines.append(line)
-                
-                for line in process.stderr:
-                    logger.error(f"임베딩 오류: {line.strip()}")
-                    stderr_lines.append(line)
+                logger.info(f"마크다운 임베딩 명령 실행: {' '.join(embedding_cmd)} < {md_script_path.name} (수정본)")
                 
-                # 프로세스 종료 대기
-                return_code = process.wait()
-                
-                # 임시 파일 삭제
-                if temp_script_path.exists():
-                    temp_script_path.unlink()
+                return_code, stderr_lines = run_embedding_process(embedding_cmd, script_source=md_script)
                 
                 if return_code != 0:
                     logger.error(f"마크다운 임베딩 실패. 반환 코드: {return_code}")
@@ -377,15 +416,16 @@ def create_rag(document_id, rag_collection_name):
                 return False
             
             # 성공적으로 RAG 생성 완료
-            # 메타데이터에 RAG 생성 여부 업데이트
-            doc["rag_created"] = True
-            doc["rag_created_at"] = datetime.datetime.now().isoformat()
-            doc["rag_collection"] = collection_name  # 사용자가 지정한 컬렉션 이름 저장
+            # 임베딩 중(백그라운드 실행) 다른 문서가 추가/삭제되었을 수 있으므로 저장 직전에 파일에서 다시 읽음
+            # (캐시된 load_metadata 대신 직접 읽고, 캐시는 메인 스크립트가 파일 변경을 보고 갱신)
+            metadata = _parse_metadata(METADATA_FILE)
             
-            # 업데이트된 메타데이터 저장
-            for i, d in enumerate(metadata):
+            # 메타데이터에 RAG 생성 여부 업데이트
+            for d in metadata:
                 if d["id"] == document_id:
-                    metadata[i] = doc
+                    d["rag_created"] = True
+                    d["rag_created_at"] = datetime.datetime.now().isoformat()
+                    d["rag_collection"] = collection_name  # 사용자가 지정한 컬렉션 이름 저장
                     break
             
             save_metadata(metadata)
@@ -428,48 +468,73 @@ def render_sidebar():
         if not metadata:
             st.info("저장된 문서가 없습니다.")
         else:
-            for doc in metadata:
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"**{doc['collection_name']}**")
-                    if doc.get('description'):  # 설명이 있으면 표시
-                        st.caption(f"설명: {doc['description']}")
-                    st.caption(f"파일: {doc.get('original_filename', doc['filename'])}")
-                    st.caption(f"형식: {doc['file_format']}, 생성: {doc['created_at'][:10]}")
-                    if doc.get("markdown_file_path"):
-                        st.caption("마크다운 변환: ✓")
-                    # RAG 생성 여부 표시
-                    if doc.get("rag_created"):
-                        st.caption(f"🟢 RAG 생성됨: {doc.get('rag_created_at', '')[:10]}")
-                with col2:
-                    if st.button("로드", key=f"load_{doc['id']}"):
-                        st.session_state.selected_document = doc
-                        st.rerun()
+            # 문서 목록을 하나의 표로 렌더링 (문서마다 컬럼/캡션/버튼 요소를 만들지 않음)
+            rows = [
+                {
+                    "컬렉션": doc["collection_name"],
+                    "설명": doc.get("description", ""),
+                    "파일": doc.get("original_filename", doc["filename"]),
+                    "형식": doc["file_format"],
+                    "생성일": doc["created_at"][:10],
+                    "MD": "✓" if doc.get("markdown_file_path") else "",
+                    "RAG": f"🟢 {doc.get('rag_created_at', '')[:10]}" if doc.get("rag_created") else "",
+                }
+                for doc in metadata
+            ]
+            # 선택 상태는 행 인덱스로만 저장되므로, 문서 목록(id 순서)이 바뀌면 위젯 key를 바꿔 이전 선택을 초기화
+            # (그대로 두면 추가/삭제 후 같은 인덱스의 다른 문서가 선택됨)
+            document_ids = tuple(doc["id"] for doc in metadata)
+            event = st.dataframe(
+                rows,
+                hide_index=True,
+                use_container_width=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key=f"document_table_{hash(document_ids)}",
+            )
+            
+            # 선택한 행의 문서 로드
+            selected_rows = event.selection.rows
+            if selected_rows:
+                doc = metadata[selected_rows[0]]
+                if st.button(f"'{doc['collection_name']}' 로드", key="load_selected_document"):
+                    st.session_state.selected_document = doc
+                    st.rerun()
 
 def rag_page():
     """RAG 페이지 메인 함수"""
     st.title("RAG 문서 관리")
     
-    # RAG 저장소 초기화
+    # RAG 저장소 초기화 (최초 1회만 실제로 실행됨)
     initialize_rag_store()
     
     # 세션 상태 초기화
-    if "collection_name" not in st.session_state:
-        st.session_state.collection_name = ""
-    if "description" not in st.session_state:
-        st.session_state.description = ""
-    if "selected_format" not in st.session_state:
-        st.session_state.selected_format = next(iter(SUPPORTED_FILE_FORMATS.keys()))
-    if "selected_document" not in st.session_state:
-        st.session_state.selected_document = None
-    if "convert_to_md" not in st.session_state:
-        st.session_state.convert_to_md = False
-    if "rag_collection_name" not in st.session_state:
-        st.session_state.rag_collection_name = ""  # 빈 값으로 초기화하여 사용자 입력 유도
+    for key, default in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, default)
     
     # 사이드바 렌더링
     render_sidebar()
     
+    # 백그라운드 RAG 생성 작업 상태 표시
+    # (작업 중에 문서 선택이 바뀌거나 해제되어도 결과를 알리고 작업 정보를 정리하도록 선택 여부와 무관하게 처리)
+    rag_job = st.session_state.get("rag_job")
+    if rag_job is not None:
+        if not rag_job["future"].done():
+            render_rag_job_status()
+        else:
+            del st.session_state.rag_job
+            if rag_job["future"].result():
+                st.success(f"RAG가 성공적으로 생성되었습니다. 컬렉션 이름: {rag_job['collection_name']}")
+                # 성공 후 메타데이터 다시 로드
+                selected_document = st.session_state.selected_document
+                if selected_document and selected_document["id"] == rag_job["document_id"]:
+                    st.session_state.selected_document = next(
+                        (d for d in load_metadata() if d["id"] == rag_job["document_id"]), 
+                        selected_document
+                    )
+            else:
+                st.error("RAG 생성 중 오류가 발생했습니다. 로그를 확인해주세요.")
+    
     # 메인 컨텐츠 영역
     col1, col2 = st.columns([1, 1])
     
@@ -572,21 +637,28 @@ def rag_page():
                 )
                 st.session_state.rag_collection_name = rag_collection_name
                 
-                if st.button("RAG 생성", use_container_width=True):
+                # 끝난 작업은 위에서 정리되므로 남아 있으면 실행 중
+                rag_job_running = "rag_job" in st.session_state
+                
+                if st.button("RAG 생성", use_container_width=True, disabled=rag_job_running):
                     if not rag_collection_name:
                         st.error("RAG 컬렉션 이름을 입력해주세요.")
                     else:
-                        with st.spinner("RAG 임베딩 생성 중... 이 작업은 몇 분 정도 소요될 수 있습니다."):
-                            if create_rag(st.session_state.selected_document["id"], rag_collection_name):
-                                st.success(f"RAG가 성공적으로 생성되었습니다. 컬렉션 이름: {rag_collection_name}")
-                                # 성공 후 메타데이터 다시 로드
-                                st.session_state.selected_document = next(
-                                    (d for d in load_metadata() if d["id"] == st.session_state.selected_document["id"]), 
-                                    st.session_state.selected_document
-                                )
-                                st.rerun()
-                            else:
-                                st.error("RAG 생성 중 오류가 발생했습니다. 로그를 확인해주세요.")
+                        # 임베딩은 수 분이 걸리므로 스크립트 스레드를 막지 않도록 백그라운드에서 실행
+                        selected_document = st.session_state.selected_document
+                        document_id = selected_document["id"]
+                        st.session_state.rag_job = {
+                            "future": get_rag_executor().submit(
+                                create_rag,
+                                document_id,
+                                selected_document["file_path"],
+                                selected_document["file_format"],
+                                rag_collection_name,
+                            ),
+                            "document_id": document_id,
+                            "collection_name": rag_collection_name,
+                        }
+                        st.rerun()
             else:
                 if st.button("RAG 생성", use_container_width=True):
                     st.error("RAG를 생성할 문서를 선택해주세요.")
@@ -633,11 +705,18 @@ def rag_page():
             
             st.divider()
             
-            # 탭 설정 - 원본 및 마크다운 변환본
+            # 보기 선택 - 원본 및 마크다운 변환본
+            # (st.tabs는 선택되지 않은 탭도 매 rerun마다 파일을 읽고 렌더링하므로 선택된 보기만 그림)
             if doc.get("markdown_file_path"):
-                tab1, tab2 = st.tabs(["원본", "마크다운 변환"])
+                view_mode = st.radio(
+                    "보기",
+                    ["원본", "마크다운 변환"],
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    key="document_view_mode"
+                )
                 
-                with tab1:
+                if view_mode == "원본":
                     # 원본 파일 내용 표시
                     file_path = doc['file_path']
                     file_format = doc['file_format'].lower()
@@ -652,8 +731,7 @@ def rag_page():
                         st.write(f"파일 경로: {file_path}")
                     else:
                         st.info(f"'{file_format}' 형식 미리보기는 지원되지 않습니다.")
-                
-                with tab2:
+                else:
                     # 마크다운 변환 내용 표시
                     md_content = read_text_file(doc["markdown_file_path"])
                     st.markdown(md_content)
@@ -704,29 +782,31 @@ def rag_page():
                 st.divider()
                 st.caption("업로드 중인 파일:")
                 
-                if file_format in ['txt', 'md']:
+                if file_format in ['txt', 'md'] and uploaded_file.size > MAX_PREVIEW_SIZE:
+                    # 큰 파일은 rerun마다 전체를 디코딩/전송하지 않도록 미리보기 생략
+                    st.write(f"파일명: {uploaded_file.name}")
+                    st.info(f"파일이 커서 미리보기를 생략합니다 ({uploaded_file.size / (1024 * 1024):.1f}MB)")
+                elif file_format in ['txt', 'md']:
                     # 텍스트 파일 내용 표시
                     try:
-                        content = uploaded_file.getvalue().decode('utf-8', errors='replace')
+                        content = str(uploaded_file.getbuffer(), 'utf-8', errors='replace')
                     except:
                         try:
                             content = uploaded_file.getvalue().decode('cp949', errors='replace')
                         except:
                             content = "파일 내용을 디코딩할 수 없습니다."
                     
-                    # 탭으로 원본과 변환 미리보기 제공
+                    # 원본은 항상 보여주고, 변환 미리보기는 체크했을 때만 생성
+                    # (st.tabs는 숨겨진 탭도 매 rerun마다 변환/렌더링하므로 사용하지 않음)
                     if file_format == 'txt' and convert_to_md:
-                        tab1, tab2 = st.tabs(["원본", "마크다운 변환 미리보기"])
-                        
-                        with tab1:
-                            st.text_area(
-                                "업로드 중인 파일 내용", 
-                                value=content,
-                                height=300,
-                                disabled=True
-                            )
-                        
-                        with tab2:
+                        st.text_area(
+                            "업로드 중인 파일 내용",
+                            value=content,
+                            height=300,
+                            disabled=True
+                        )
+
+                        if st.checkbox("마크다운 변환 미리보기", value=False, key="show_upload_md_preview"):
                             md_content = convert_to_markdown(content)
                             st.markdown(md_content)
                     else:
@@ -1,13 +1,16 @@
 import os
 import pathlib
+import sys
 import numpy as np
 import time
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 import vertexai
 from vertexai.language_models import TextEmbeddingModel
+from google.api_core.exceptions import ResourceExhausted
 from pymilvus import (
     connections,
     FieldSchema, CollectionSchema, DataType,
@@ -35,6 +38,10 @@ CHUNK_OVERLAP     = 150   # 이웃 청크와 겹칠 문자 수
 
 # Vertex AI API 제한사항
 MAX_BATCH_SIZE    = 250   # API 요청당 최대 텍스트 수
+MAX_CONCURRENT_BATCHES = 4  # 동시에 보낼 임베딩 요청 수 (요청 제한을 넘지 않도록 소수로 제한)
+EMBED_MAX_RETRIES      = 5    # 요청 한도 초과(429) 시 최대 재시도 횟수
+EMBED_RETRY_BASE_DELAY = 1.0  # 재시도 대기 시간 (초, 재시도마다 2배씩 증가)
+MAX_CONCURRENT_FILES   = 2  # 동시에 처리할 파일 수 (파일당 배치 동시 요청과 곱해지므로 작게 유지)
 
 def setup_tfidf_vectorizer():
     """TF-IDF 벡터라이저 초기화 (희소 벡터 생성용)"""
@@ -131,6 +138,22 @@ def chunk_text_by_char(text: str, size: int, overlap: int):
         start += size - overlap
     return chunks
 
+def embed_batch(model, batch: List[str]):
+    """배치 하나의 밀집 벡터 생성 (요청 한도 초과 시 지수 백오프로 재시도)
+
+    0 벡터로 채워 넣으면 인덱스가 오염되므로, 재시도 후에도 실패하면 예외를 그대로 올려 해당 파일 삽입을 중단
+    """
+    for attempt in range(EMBED_MAX_RETRIES):
+        try:
+            embeddings = model.get_embeddings(batch)
+            return [embedding.values for embedding in embeddings]
+        except ResourceExhausted as e:
+            if attempt == EMBED_MAX_RETRIES - 1:
+                raise
+            delay = EMBED_RETRY_BASE_DELAY * (2 ** attempt)
+            print(f"[Retry] 임베딩 요청 한도 초과, {delay:.1f}초 후 재시도 ({attempt + 1}/{EMBED_MAX_RETRIES - 1}): {e}")
+            time.sleep(delay)
+
 def process_chunks_in_batches(chunks: List[str], model, vectorizer, batch_size=MAX_BATCH_SIZE):
     """청크를 배치 단위로 처리하여 밀집 및 희소 벡터 생성"""
     all_dense_vectors = []
@@ -139,23 +162,16 @@ def process_chunks_in_batches(chunks: List[str], model, vectorizer, batch_size=M
     # TF-IDF 희소 벡터 생성을 위해 전체 코퍼스로 학습
     vectorizer.fit(chunks)
     
-    # 배치 단위로 처리
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i:i+batch_size]
-        print(f"[Batch] {i//batch_size + 1}번째 배치 처리 중 ({len(batch)}개 청크)")
-        
-        # 1. 밀집 벡터 생성 (Vertex AI)
-        try:
-            embeddings = model.get_embeddings(batch)
-            dense_vectors = [embedding.values for embedding in embeddings]
+    batches = [chunks[i:i+batch_size] for i in range(0, len(chunks), batch_size)]
+    print(f"[Batch] {len(batches)}개 배치 처리 중 (총 {len(chunks)}개 청크, 최대 {MAX_CONCURRENT_BATCHES}개 동시 요청)")
+    
+    # 1. 밀집 벡터 생성 (Vertex AI) - 배치 요청을 제한된 개수만큼 동시에 보내고 순서대로 결과 수집
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as executor:
+        for dense_vectors in executor.map(lambda batch: embed_batch(model, batch), batches):
             all_dense_vectors.extend(dense_vectors)
-        except Exception as e:
-            print(f"[Error] 밀집 벡터 생성 중 오류: {e}")
-            # 오류 발생 시 0으로 채운 벡터 추가
-            zero_vectors = [[0.0] * EMBEDDING_DIM for _ in range(len(batch))]
-            all_dense_vectors.extend(zero_vectors)
-        
-        # 2. 희소 벡터 생성 (TF-IDF)
+    
+    # 2. 희소 벡터 생성 (TF-IDF)
+    for batch in batches:
         sparse_matrix = vectorizer.transform(batch)
         
         # 각 행을 Milvus 희소 벡터 형식으로 변환
@@ -164,14 +180,10 @@ def process_chunks_in_batches(chunks: List[str], model, vectorizer, batch_size=M
             indices = row.indices.tolist()
             values = row.data.tolist()
             all_sparse_vectors.append({"indices": indices, "values": values})
-        
-        # API 요청 제한을 고려한 지연 시간 추가
-        if i + batch_size < len(chunks):
-            time.sleep(0.5)  # 0.5초 대기
     return all_dense_vectors, all_sparse_vectors
 
 def insert_file_with_hybrid_chunks(file_info, collection, model, vectorizer, root_dir):
-    """파일을 읽고 문자 단위 청킹 후 하이브리드 임베딩하여 Milvus에 삽입"""
+    """파일을 읽고 문자 단위 청킹 후 하이브리드 임베딩하여 Milvus에 삽입 (실패 시 False 반환)"""
     print("-----------------  insert_file_with_hybrid_chunks  ---------------------------")
     path = file_info["path"]
     rel  = file_info["rel"]
@@ -181,25 +193,24 @@ def insert_file_with_hybrid_chunks(file_info, collection, model, vectorizer, roo
         text = path.read_text(encoding="utf-8").strip()
         if not text:
             print(f"[Skip] 빈 파일: {rel}")
-            return
+            return True
 
         # 문자 단위 청킹
         chunks = chunk_text_by_char(text, CHUNK_SIZE, CHUNK_OVERLAP)
         if not chunks:
             print(f"[Skip] 청킹 후 내용 없음: {rel}")
-            return
+            return True
             
         # 밀집 및 희소 벡터 생성 (배치 처리)
         dense_vectors, sparse_vectors = process_chunks_in_batches(chunks, model, vectorizer)
 
-        # 각 필드 데이터 준비
-        file_paths, langs, titles, contents, dirs = [], [], [], [], []
-        for idx, chunk in enumerate(chunks):
-            file_paths.append(rel)
-            langs.append(lang)
-            titles.append(f"{path.stem}_chunk{idx}")
-            contents.append(chunk)
-            dirs.append(str(path.parent.relative_to(root_dir)))
+        # 각 필드 데이터 준비 (파일 단위로 같은 값은 한 번만 계산해 청크 수만큼 복제)
+        num_chunks = len(chunks)
+        file_paths = [rel] * num_chunks
+        langs = [lang] * num_chunks
+        titles = [f"{path.stem}_chunk{idx}" for idx in range(num_chunks)]
+        contents = chunks
+        dirs = [str(path.parent.relative_to(root_dir))] * num_chunks
 
         # Milvus에 삽입 (배치 단위로)
         max_batch = 1000  # Milvus 삽입 배치 크기 (64MB 제한 고려)
@@ -224,33 +235,55 @@ def insert_file_with_hybrid_chunks(file_info, collection, model, vectorizer, roo
                 batch_contents,  # content 필드
                 batch_dirs,      # directory 필드
             ]
-            print(f"entities 삽입 시작 : {entities}")
+            # 벡터 전체를 문자열로 만들면 배치당 수십 MB가 되므로 건수만 출력
+            print(f"entities 삽입 시작 : {rel} {len(batch_dense)}개 청크")
             
             try:
                 res = collection.insert(entities)
                 print(f"[Inserted] {rel} 배치 {i//max_batch + 1}/{(len(chunks)+max_batch-1)//max_batch} → {len(batch_dense)}개 청크")
             except Exception as e:
                 print(f"[Error] {rel} 삽입 중 오류: {e}")
+                return False
+
+        return True
 
     except Exception as e:
         print(f"[Error] {rel} 처리 중 예외: {e}")
+        return False
 
 def main():
     model = setup_vertex_ai()
-    vectorizer = setup_tfidf_vectorizer()
     collection = setup_milvus_collection()
 
     if not DOCS_ROOT.exists():
         print(f"[Error] MkDocs 루트가 잘못되었습니다: {DOCS_ROOT}")
-        return
+        sys.exit(1)
 
     md_files = find_markdown_files(DOCS_ROOT)
     if not md_files:
         print("[Info] 삽입할 파일이 없습니다.")
         return
 
-    for file_info in md_files:
-        insert_file_with_hybrid_chunks(file_info, collection, model, vectorizer, DOCS_ROOT)
+    # 파일을 제한된 개수만큼 동시에 처리
+    # (TF-IDF는 파일마다 해당 파일의 청크로 다시 학습하므로 파일별로 벡터라이저를 따로 만들어 공유 상태를 없앰)
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FILES) as executor:
+        futures = [
+            executor.submit(
+                insert_file_with_hybrid_chunks,
+                file_info, collection, model, setup_tfidf_vectorizer(), DOCS_ROOT
+            )
+            for file_info in md_files
+        ]
+        failed_files = [
+            file_info["rel"]
+            for file_info, future in zip(md_files, futures)
+            if not future.result()
+        ]
+
+    if failed_files:
+        print(f"[Failed] {len(failed_files)}개 파일 처리 중 오류가 발생했습니다: {failed_files}")
+        # 호출한 RAG 페이지가 반환 코드로 실패를 알 수 있도록 0이 아닌 값으로 종료
+        sys.exit(1)
 
     print("[Done] 모든 파일의 하이브리드 임베딩 청크 삽입 완료")
 
@@ -3,12 +3,15 @@ import pathlib
 import numpy as np
 import time
 import argparse
+import sys
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 import vertexai
 from vertexai.language_models import TextEmbeddingModel
+from google.api_core.exceptions import ResourceExhausted
 from pymilvus import (
     connections,
     FieldSchema, CollectionSchema, DataType,
@@ -31,6 +34,9 @@ CHUNK_OVERLAP     = 150   # 이웃 청크와 겹칠 문자 수
 
 # Vertex AI API 제한사항
 MAX_BATCH_SIZE    = 250   # API 요청당 최대 텍스트 수
+MAX_CONCURRENT_BATCHES = 4  # 동시에 보낼 임베딩 요청 수 (요청 제한을 넘지 않도록 소수로 제한)
+EMBED_MAX_RETRIES      = 5    # 요청 한도 초과(429) 시 최대 재시도 횟수
+EMBED_RETRY_BASE_DELAY = 1.0  # 재시도 대기 시간 (초, 재시도마다 2배씩 증가)
 
 def setup_tfidf_vectorizer():
     """TF-IDF 벡터라이저 초기화 (희소 벡터 생성용)"""
@@ -97,29 +103,32 @@ def chunk_text_by_char(text: str, size: int, overlap: int):
         start += size - overlap
     return chunks
 
+def embed_batch(model, batch: List[str]):
+    """배치 하나의 밀집 벡터 생성 (요청 한도 초과 시 지수 백오프로 재시도)
+
+    0 벡터로 채워 넣으면 인덱스가 오염되므로, 재시도 후에도 실패하면 예외를 그대로 올려 해당 파일 삽입을 중단
+    """
+    for attempt in range(EMBED_MAX_RETRIES):
+        try:
+            embeddings = model.get_embeddings(batch)
+            return [embedding.values for embedding in embeddings]
+        except ResourceExhausted as e:
+            if attempt == EMBED_MAX_RETRIES - 1:
+                raise
+            delay = EMBED_RETRY_BASE_DELAY * (2 ** attempt)
+            print(f"[Retry] 임베딩 요청 한도 초과, {delay:.1f}초 후 재시도 ({attempt + 1}/{EMBED_MAX_RETRIES - 1}): {e}")
+            time.sleep(delay)
+
 def process_chunks_in_batches(chunks: List[str], model, vectorizer, batch_size=MAX_BATCH_SIZE):
     """청크를 배치 단위로 처리하여 밀집 벡터 생성"""
     all_dense_vectors = []
+    batches = [chunks[i:i+batch_size] for i in range(0, len(chunks), batch_size)]
+    print(f"[Batch] {len(batches)}개 배치 처리 중 (총 {len(chunks)}개 청크, 최대 {MAX_CONCURRENT_BATCHES}개 동시 요청)")
     
-    # 배치 단위로 처리
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i:i+batch_size]
-        print(f"[Batch] {i//batch_size + 1}번째 배치 처리 중 ({len(batch)}개 청크)")
-        
-        # 밀집 벡터 생성 (Vertex AI)
-        try:
-            embeddings = model.get_embeddings(batch)
-            dense_vectors = [embedding.values for embedding in embeddings]
+    # 밀집 벡터 생성 (Vertex AI) - 배치 요청을 제한된 개수만큼 동시에 보내고 순서대로 결과 수집
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as executor:
+        for dense_vectors in executor.map(lambda batch: embed_batch(model, batch), batches):
             all_dense_vectors.extend(dense_vectors)
-        except Exception as e:
-            print(f"[Error] 밀집 벡터 생성 중 오류: {e}")
-            # 오류 발생 시 0으로 채운 벡터 추가
-            zero_vectors = [[0.0] * EMBEDDING_DIM for _ in range(len(batch))]
-            all_dense_vectors.extend(zero_vectors)
-        
-        # API 요청 제한을 고려한 지연 시간 추가
-        if i + batch_size < len(chunks):
-            time.sleep(0.5)  # 0.5초 대기
     return all_dense_vectors
 
 def process_single_txt_file(file_path, collection, model, vectorizer):
@@ -162,18 +171,21 @@ def process_single_txt_file(file_path, collection, model, vectorizer):
         # 밀집 벡터만 생성 (희소 벡터 제거)
         dense_vectors = process_chunks_in_batches(chunks, model, vectorizer)
         
-        # 각 필드 데이터 준비
-        file_paths, langs, titles, contents, dirs = [], [], [], [], []
-        for idx, chunk in enumerate(chunks):
-            file_paths.append(str(file_path))
-            langs.append(lang)
-            
-            # 타이틀 설정: 파일명 + 청크 번호 + 청크 시작부분
-            title_preview = chunk[:20].replace("\n", " ")
-            titles.append(f"{file_path.stem}_chunk{idx}: {title_preview}...")
-            
-            contents.append(chunk)
-            dirs.append(str(file_path.parent))
+        # 각 필드 데이터 준비 (파일 단위로 같은 값은 한 번만 계산해 청크 수만큼 복제)
+        num_chunks = len(chunks)
+        file_paths = [str(file_path)] * num_chunks
+        langs = [lang] * num_chunks
+        
+        # 타이틀 설정: 파일명 + 청크 번호 + 청크 시작부분
+        file_stem = file_path.stem
+        title_previews = (chunk[:20].replace("\n", " ") for chunk in chunks)
+        titles = [
+            f"{file_stem}_chunk{idx}: {title_preview}..."
+            for idx, title_preview in enumerate(title_previews)
+        ]
+        
+        contents = chunks
+        dirs = [str(file_path.parent)] * num_chunks
         
         # Milvus에 삽입 (배치 단위로)
         max_batch = 1000  # Milvus 삽입 배치 크기
@@ -245,6 +257,8 @@ def main():
         print(f"[Done] '{args.file}' 파일이 성공적으로 Milvus에 저장되었습니다.")
     else:
         print(f"[Failed] '{args.file}' 파일 처리 중 오류가 발생했습니다.")
+        # 호출한 RAG 페이지가 반환 코드로 실패를 알 수 있도록 0이 아닌 값으로 종료
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
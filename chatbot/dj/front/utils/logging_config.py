@@ -1,6 +1,8 @@
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 import pathlib
 import sys
@@ -8,7 +10,29 @@ import sys
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 LOG_LEVEL = getattr(logging, LOG_LEVEL)
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+LOG_DIR = pathlib.Path(__file__).resolve().parent / "logs"
+
+# 로그 디렉토리는 모듈 로드 시 한 번만 생성 (로거마다 다시 확인하지 않음)
+LOG_DIR.mkdir(exist_ok=True)
+
+# 파일명에 날짜를 포함시켜 로그 파일을 생성
+LOG_FILE = LOG_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.log"
+
+# 파일 핸들러 설정 - 날짜별로 파일 교체 (모든 로거가 하나의 핸들러를 공유)
+_file_handler = TimedRotatingFileHandler(
+    LOG_FILE,
+    when="midnight",
+    interval=1,
+    backupCount=30,  # 30일간의 로그 유지
+)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_file_handler.setLevel(LOG_LEVEL)
+
+# 실제 파일 쓰기는 리스너 스레드에서 처리 (로그를 남기는 쪽은 큐에 넣기만 함)
+_log_queue = queue.SimpleQueue()
+_queue_listener = QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_queue_listener.start()
+atexit.register(_queue_listener.stop)
 
 # 전역 로거 저장소
 LOGGERS = {}
@@ -33,23 +57,9 @@ def setup_logger(name):
         LOGGERS[name] = logger
         return logger
 
-    # 로그 디렉토리가 없으면 생성
-    pathlib.Path(LOG_DIR).mkdir(exist_ok=True)
-
-    # 파일명에 날짜를 포함시켜 로그 파일을 생성
-    log_file = os.path.join(
-        LOG_DIR, f"{datetime.now().strftime('%Y-%m-%d')}.log"
-    )
-
-    # 파일 핸들러 설정 - 날짜별로 파일 교체
-    file_handler = TimedRotatingFileHandler(
-        log_file,
-        when="midnight",
-        interval=1,
-        backupCount=30,  # 30일간의 로그 유지
-    )
-    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    file_handler.setLevel(LOG_LEVEL)
+    # 파일 로그는 큐를 통해 공유 파일 핸들러로 전달
+    queue_handler = QueueHandler(_log_queue)
+    queue_handler.setLevel(LOG_LEVEL)
 
     # 스트림릿 환경에서는 콘솔 출력 최소화
     is_streamlit = "streamlit" in sys.modules
@@ -61,7 +71,7 @@ def setup_logger(name):
     console_handler.setLevel(console_level)
 
     # 핸들러 추가
-    logger.addHandler(file_handler)
+    logger.addHandler(queue_handler)
     logger.addHandler(console_handler)
 
     # 로거 캐시
@@ -1,6 +1,6 @@
 import os
+import pathlib
 from typing import Dict, List, Any
-import aiofiles
 
 from langchain_google_vertexai import ChatVertexAI
 from dotenv import load_dotenv
@@ -24,6 +24,10 @@ _mcp_tools_cache = None
 
 langfuse_handler = CallbackHandler(public_key="", secret_key="", host="")
 
+# 프롬프트 경로 계산과 파일 읽기는 요청마다 하지 않고 모듈 로드 시 한 번만 수행
+PROMPT_PATH = os.path.join(os.path.dirname(__file__), "../prompts/general_agent.txt")
+PROMPT_TEMPLATE = pathlib.Path(PROMPT_PATH).read_text(encoding="utf-8")
+
 # MCP 서버 URL 설정
 MCP_SERVERS = {
     # "github": {
@@ -160,11 +164,7 @@ async def generate_prompt() -> str:
         logger.info(f"도구 정보 가져오기 중 오류 발생: {str(e)}")
         tools_text = "도구 정보를 가져오는 중 오류가 발생했습니다. MCP 서버 연결을 확인하세요."
     
-    prompt_path = os.path.join(
-        os.path.dirname(__file__), "../prompts/general_agent.txt"
-    )
-    async with aiofiles.open(prompt_path, mode="r", encoding="utf-8") as f:
-        prompt_template = await f.read()
+    prompt_template = PROMPT_TEMPLATE
     
     # {tools} 변수만 실제 변수로 처리하고 나머지는 일반 텍스트로 처리하기 위한 방법
     
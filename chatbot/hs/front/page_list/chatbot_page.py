@@ -2,7 +2,10 @@ import os
 import json
 import uuid
 import asyncio
+from collections import deque
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 import streamlit as st
@@ -16,6 +19,9 @@ logger = setup_logger(__name__)
 
 AGENT_SERVER_HOST = os.environ.get("AGENT_SERVER_HOST", "http://localhost:8800")
 
+# 화면에 유지할 최대 메시지 수 (rerun마다 전체 이력을 다시 그리므로 오래된 메시지부터 제거)
+MAX_MESSAGES = int(os.environ.get("MAX_MESSAGES", "100"))
+
 # 에이전트 모드 상수 정의
 AGENT_MODES = {
     "general": "general",  
@@ -23,6 +29,20 @@ AGENT_MODES = {
 }
 
 
+@st.cache_resource
+def get_http_session():
+    """Shared HTTP session for the agent server (reuses TCP connections)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def generate_session_id():
     """Generate New session id"""
     return str(uuid.uuid4())
@@ -34,7 +54,7 @@ def initialize():
         st.session_state.session_id = generate_session_id()
 
     if SessionState.MESSAGES.value not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = deque(maxlen=MAX_MESSAGES)
 
     # 에이전트 모드 초기화
     if "agent_mode" not in st.session_state:
@@ -55,7 +75,7 @@ def get_chat_response(message, session_id=None):
     data[Request.AGENT_MODE.value] = st.session_state.agent_mode
 
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = get_http_session().post(url, headers=headers, data=json.dumps(data))
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -85,12 +105,11 @@ def render_sidebar():
             default=st.session_state.agent_mode,
         )
 
-        # 모드가 변경되면 세션 상태 업데이트하고 즉시 페이지 리프레시
+        # 모드가 변경되면 세션 상태만 업데이트
+        # (아래 설명/캡션은 이 시점 이후에 그려지므로 st.rerun()으로 스크립트를 한 번 더 돌릴 필요 없음)
         if selected_mode and selected_mode != st.session_state.agent_mode:
             st.session_state.agent_mode = selected_mode
             st.success(f"{selected_mode} 모드로 변경되었습니다!")
-            # 즉시 페이지 리프레시
-            st.rerun()
 
         # 모드별 설명 표시
         mode_descriptions = {
@@ -115,7 +134,7 @@ def render_sidebar():
         if st.button("New Session"):
             new_session_id = generate_session_id()
             st.session_state.session_id = new_session_id
-            st.session_state.messages = []
+            st.session_state.messages.clear()
             st.success(f"New session created with ID: {new_session_id}")
             st.rerun()
 
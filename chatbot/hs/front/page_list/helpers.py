@@ -3,12 +3,8 @@
 """
 
 import os
-import requests
 import datetime
 
-from PIL import Image
-import streamlit as st
-
 from utils.logging_config import setup_logger
 
 # 로거 설정
@@ -1,8 +1,11 @@
 import os
+import re
 import uuid
 import json
 import asyncio
 import logging
+import itertools
+from collections import deque
 import traceback
 from typing import Dict, List, Any
 from datetime import datetime
@@ -10,6 +13,7 @@ from pydantic import BaseModel
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from sse_starlette.sse import EventSourceResponse
 
@@ -20,6 +24,18 @@ from dotenv import load_dotenv
 from mcp_client_agent import make_graph
 from langchain_core.messages import HumanMessage
 
+# orjson이 있으면 SSE 이벤트 직렬화에 사용 (이미지 base64 같은 큰 문자열에서 훨씬 빠름)
+try:
+    import orjson
+
+    def dumps_event_data(data: Dict) -> str:
+        """SSE 이벤트 데이터를 JSON 문자열로 직렬화합니다."""
+        return orjson.dumps(data).decode("utf-8")
+except ImportError:
+    def dumps_event_data(data: Dict) -> str:
+        """SSE 이벤트 데이터를 JSON 문자열로 직렬화합니다."""
+        return json.dumps(data)
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -47,17 +63,24 @@ AVAILABLE_MODELS = [
     }
 ]
 
+# 세션당 보관할 최대 메시지 수 (오래된 메시지부터 제거)
+MAX_SESSION_MESSAGES = int(os.getenv("MAX_SESSION_MESSAGES", "100"))
+
+# 메시지 ID 생성용 카운터
+# (세션이 인메모리에만 있으므로 프로세스 내에서만 고유하면 충분하여 uuid 생성 비용을 생략)
+_message_id_counter = itertools.count(1)
+
 # 클래스 정의: 세션 관리
 class ChatSession:
     def __init__(self, session_id: str):
         self.session_id = session_id
         self.created_at = datetime.now().isoformat()
-        self.messages = []
+        self.messages = deque(maxlen=MAX_SESSION_MESSAGES)
         
     def add_message(self, message: Dict):
         """메시지를 세션에 추가합니다."""
         if "id" not in message:
-            message["id"] = str(uuid.uuid4())
+            message["id"] = f"msg_{next(_message_id_counter)}"
         if "timestamp" not in message:
             message["timestamp"] = datetime.now().isoformat()
         self.messages.append(message)
@@ -68,7 +91,7 @@ class ChatSession:
         return {
             "session_id": self.session_id,
             "created_at": self.created_at,
-            "messages": self.messages
+            "messages": list(self.messages)
         }
 
 # 인메모리 세션 저장소
@@ -98,6 +121,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class NonStreamingGZipMiddleware(GZipMiddleware):
+    """SSE 응답(text/event-stream)은 압축하지 않고 그대로 전달하는 GZip 미들웨어"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        app = self.app
+
+        async def route_by_content_type(scope, receive, gzip_send):
+            # 응답 헤더의 Content-Type을 보고 압축 여부를 결정
+            # (text/event-stream을 압축하면 압축기가 flush할 때까지 이벤트가 묶여서 스트림이 멈춤)
+            is_event_stream = False
+
+            async def routed_send(message):
+                nonlocal is_event_stream
+                if message["type"] == "http.response.start":
+                    is_event_stream = any(
+                        key.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                        for key, value in message.get("headers", [])
+                    )
+                await (send if is_event_stream else gzip_send)(message)
+
+            await app(scope, receive, routed_send)
+
+        gzip = GZipMiddleware(
+            route_by_content_type, minimum_size=self.minimum_size, compresslevel=self.compresslevel
+        )
+        await gzip(scope, receive, send)
+
+# 응답 압축 (이미지 base64가 담긴 메시지 응답 크기를 줄임, 작은 응답과 SSE 스트림은 그대로 전송)
+app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024)
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
@@ -123,7 +180,7 @@ async def get_chat_messages(session_id: str):
     
     return {
         "session_id": session_id,
-        "messages": chat_sessions[session_id].messages
+        "messages": list(chat_sessions[session_id].messages)
     }
 
 @app.delete("/api/chat/sessions/{session_id}")
@@ -155,7 +212,8 @@ async def send_message(session_id: str, message_request: MessageRequest):
             session.messages, 
             message_request.model_config
         )
-        logger.info(f"MCP 서버 result 응답: {response}")
+        # 에이전트 전체 상태(메시지 이력, 이미지 포함)는 DEBUG일 때만 문자열로 변환
+        logger.debug("MCP 서버 result 응답: %s", response)
         
         # 응답 처리 및 저장
         processed_response = process_mcp_response(response)
@@ -190,15 +248,29 @@ async def stream_message(session_id: str, message_request: MessageRequest):
     
     return EventSourceResponse(stream_mcp_response(session_id, message_request))
 
+# 문장 단위 청크 (문장부호/줄바꿈까지와 뒤따르는 공백을 하나의 청크로 묶음)
+SENTENCE_CHUNK_PATTERN = re.compile(r'[^.!?\n]*(?:[.!?]+|\n+|$)\s*')
+
+def split_sentences(text: str) -> List[str]:
+    """텍스트를 문장 단위 청크로 나눕니다. 청크를 이어 붙이면 원문과 같습니다."""
+    return [chunk for chunk in SENTENCE_CHUNK_PATTERN.findall(text) if chunk]
+
+async def stream_text_events(text: str):
+    """텍스트를 문장 단위 message_text 이벤트로 스트리밍합니다."""
+    for sentence in split_sentences(text):
+        yield {
+            "event": "message_text",
+            "data": dumps_event_data({"text": sentence})
+        }
+
 async def stream_mcp_response(session_id: str, message_request: MessageRequest):
     """MCP 서버 응답을 스트리밍합니다."""
     session = chat_sessions[session_id]
-    current_text = ""
     
     # 처리 시작 이벤트
     yield {
         "event": "thinking",
-        "data": json.dumps({"status": "processing"})
+        "data": dumps_event_data({"status": "processing"})
     }
     
     try:
@@ -215,22 +287,16 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
         # 응답 시작 이벤트
         yield {
             "event": "message_start",
-            "data": json.dumps({"status": "start"})
+            "data": dumps_event_data({"status": "start"})
         }
         
         # 응답 타입에 따른 처리
         if isinstance(processed_response, list):
             for item in processed_response:
                 if item["type"] == "text":
-                    # 텍스트 메시지 스트리밍 (단어 단위)
-                    words = item["content"].split()
-                    for word in words:
-                        current_text += word + " "
-                        await asyncio.sleep(0.05)  # 의도적 지연
-                        yield {
-                            "event": "message_text",
-                            "data": json.dumps({"text": word + " "})
-                        }
+                    # 텍스트 메시지 스트리밍 (문장 단위)
+                    async for event in stream_text_events(item["content"]):
+                        yield event
                     
                     # 텍스트 메시지 저장
                     item["role"] = "assistant"
@@ -240,7 +306,7 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
                     # 이미지 메시지 이벤트
                     yield {
                         "event": "message_image",
-                        "data": json.dumps({
+                        "data": dumps_event_data({
                             "data": item["content"],
                             "caption": item.get("caption", "")
                         })
@@ -251,15 +317,9 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
                     session.add_message(item)
         else:
             if processed_response["type"] == "text":
-                # 텍스트 메시지 스트리밍 (단어 단위)
-                words = processed_response["content"].split()
-                for word in words:
-                    current_text += word + " "
-                    await asyncio.sleep(0.05)  # 의도적 지연
-                    yield {
-                        "event": "message_text",
-                        "data": json.dumps({"text": word + " "})
-                    }
+                # 텍스트 메시지 스트리밍 (문장 단위)
+                async for event in stream_text_events(processed_response["content"]):
+                    yield event
                 
                 # 텍스트 메시지 저장
                 processed_response["role"] = "assistant"
@@ -269,7 +329,7 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
                 # 이미지 메시지 이벤트
                 yield {
                     "event": "message_image",
-                    "data": json.dumps({
+                    "data": dumps_event_data({
                         "data": processed_response["content"],
                         "caption": processed_response.get("caption", "")
                     })
@@ -282,7 +342,7 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
         # 메시지 종료 이벤트
         yield {
             "event": "message_end",
-            "data": json.dumps({"status": "complete"})
+            "data": dumps_event_data({"status": "complete"})
         }
         
     except asyncio.TimeoutError:
@@ -290,7 +350,7 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
         timeout_seconds = message_request.model_config.get("timeout_seconds", 60)
         yield {
             "event": "timeout",
-            "data": json.dumps({
+            "data": dumps_event_data({
                 "message": f"응답 생성 시간이 {timeout_seconds}초를 초과했습니다."
             })
         }
@@ -308,7 +368,7 @@ async def stream_mcp_response(session_id: str, message_request: MessageRequest):
         logger.error(traceback.format_exc())
         yield {
             "event": "error",
-            "data": json.dumps({
+            "data": dumps_event_data({
                 "message": f"오류가 발생했습니다: {str(e)}"
             })
         }
@@ -2,11 +2,28 @@ import streamlit as st
 import os
 import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import base64
+try:
+    # SIMD 가속 base64 디코더 (큰 이미지 디코딩용)
+    from pybase64 import b64decode as decode_base64
+except ImportError:
+    from binascii import a2b_base64 as decode_base64
 import logging
-from io import BytesIO
-from datetime import datetime
+from collections import deque
+
+# orjson이 있으면 메시지 응답 파싱에 사용 (이미지 base64 같은 큰 문자열에서 훨씬 빠름)
+try:
+    import orjson
+
+    def parse_json_response(response):
+        """HTTP 응답 본문을 JSON으로 파싱합니다."""
+        return orjson.loads(response.content)
+except ImportError:
+    def parse_json_response(response):
+        """HTTP 응답 본문을 JSON으로 파싱합니다."""
+        return response.json()
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,6 +32,54 @@ logger = logging.getLogger(__name__)
 # 환경 변수에서 API URL 가져오기 (기본값 설정)
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8080/api")
 
+# 화면에 유지할 최대 메시지 수 (rerun마다 전체 이력을 다시 그리므로 오래된 메시지부터 제거)
+MAX_MESSAGES = int(os.environ.get("MAX_MESSAGES", "100"))
+
+# 디코딩을 허용할 이미지 base64 문자열 최대 길이 (기본 약 10MB 이미지, 초과 시 디코딩하지 않음)
+MAX_IMAGE_BASE64_LENGTH = int(os.environ.get("MAX_IMAGE_BASE64_LENGTH", str(10 * 1024 * 1024 * 4 // 3)))
+
+# 기본 모델 (모델 목록 API 호출 실패 시 사용)
+DEFAULT_MODEL_OPTIONS = {"gemini-2.0-flash": "Gemini 2.0 Flash"}
+
+@st.cache_resource
+def get_http_session():
+    """백엔드 API 호출용 공유 HTTP 세션 (rerun마다 새 TCP 연결을 맺지 않도록 재사용)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_model_options(api_base_url):
+    """사용 가능한 모델 목록 조회 (rerun마다 API를 호출하지 않도록 30초간 캐시)"""
+    try:
+        response = get_http_session().get(f"{api_base_url}/models", timeout=2)
+        if response.status_code == 200:
+            models_data = response.json()
+            return {m["id"]: m["name"] for m in models_data["models"]}
+        # API 호출 실패 시 기본 모델 설정
+        return DEFAULT_MODEL_OPTIONS
+    except Exception:
+        # 네트워크 오류 등의 예외 처리
+        return DEFAULT_MODEL_OPTIONS
+
+def get_image_bytes(message):
+    """이미지 메시지의 base64 내용을 디코딩 (rerun마다 다시 디코딩하지 않도록 결과를 메시지에 보관)"""
+    image_data = message.get("image_bytes")
+    if image_data is None:
+        # 디코딩 전에 길이만으로 먼저 거름 (큰 bytes를 만들지 않도록)
+        content = message["content"]
+        if len(content) > MAX_IMAGE_BASE64_LENGTH:
+            raise ValueError(f"이미지 데이터가 너무 큽니다: {len(content)}자 (최대 {MAX_IMAGE_BASE64_LENGTH}자)")
+        image_data = decode_base64(content)
+        message["image_bytes"] = image_data
+    return image_data
+
 # 페이지 설정
 st.set_page_config(
     page_title="슬라임 챗봇",
@@ -38,12 +103,12 @@ st.title("슬라임 챗봇")
 
 # 세션 상태 초기화
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = deque(maxlen=MAX_MESSAGES)
 
 if "session_id" not in st.session_state:
     # 새 세션 생성 API 호출
     try:
-        response = requests.post(f"{API_BASE_URL}/chat/sessions")
+        response = get_http_session().post(f"{API_BASE_URL}/chat/sessions")
         if response.status_code == 200:
             session_data = response.json()
             st.session_state.session_id = session_data["session_id"]
@@ -102,18 +167,7 @@ with st.sidebar:
     # 모델 선택 (API에서 가져오기)
     st.subheader("모델 설정")
     
-    try:
-        # 사용 가능한 모델 목록 API 호출
-        response = requests.get(f"{api_base_url}/models")
-        if response.status_code == 200:
-            models_data = response.json()
-            model_options = {m["id"]: m["name"] for m in models_data["models"]}
-        else:
-            # API 호출 실패 시 기본 모델 설정
-            model_options = {"gemini-2.0-flash": "Gemini 2.0 Flash"}
-    except Exception:
-        # 네트워크 오류 등의 예외 처리
-        model_options = {"gemini-2.0-flash": "Gemini 2.0 Flash"}
+    model_options = fetch_model_options(api_base_url)
     
     selected_model = st.selectbox(
         "Gemini 모델",
@@ -145,7 +199,7 @@ with st.sidebar:
                 "url": mcp_server_url,
                 "transport": mcp_transport
             }
-            response = requests.post(f"{api_base_url}/mcp/settings", json=settings_data)
+            response = get_http_session().post(f"{api_base_url}/mcp/settings", json=settings_data)
             
             if response.status_code == 200:
                 st.success("MCP 서버 설정이 저장되었습니다.")
@@ -162,7 +216,7 @@ with st.sidebar:
                 "url": mcp_server_url,
                 "transport": mcp_transport
             }
-            response = requests.post(f"{api_base_url}/mcp/connection/test", json=connection_data)
+            response = get_http_session().post(f"{api_base_url}/mcp/connection/test", json=connection_data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -179,13 +233,13 @@ with st.sidebar:
     if st.button("대화 초기화"):
         # 세션 삭제 API 호출
         try:
-            requests.delete(f"{api_base_url}/chat/sessions/{st.session_state.session_id}")
+            get_http_session().delete(f"{api_base_url}/chat/sessions/{st.session_state.session_id}")
         except Exception:
             pass  # 오류 무시
         
         # 새 세션 생성
         try:
-            response = requests.post(f"{api_base_url}/chat/sessions")
+            response = get_http_session().post(f"{api_base_url}/chat/sessions")
             if response.status_code == 200:
                 session_data = response.json()
                 st.session_state.session_id = session_data["session_id"]
@@ -194,16 +248,16 @@ with st.sidebar:
         except Exception:
             st.session_state.session_id = str(uuid.uuid4())
         
-        st.session_state.messages = []
+        st.session_state.messages.clear()
         st.experimental_rerun()
 
 # 서버에서 대화 기록 불러오기 (초기화 시)
 if not st.session_state.messages:
     try:
-        response = requests.get(f"{api_base_url}/chat/sessions/{st.session_state.session_id}/messages")
+        response = get_http_session().get(f"{api_base_url}/chat/sessions/{st.session_state.session_id}/messages")
         if response.status_code == 200:
-            data = response.json()
-            st.session_state.messages = data["messages"]
+            data = parse_json_response(response)
+            st.session_state.messages = deque(data["messages"], maxlen=MAX_MESSAGES)
     except Exception:
         pass  # 에러 발생 시 무시 (로컬 상태 유지)
 
@@ -218,8 +272,7 @@ for message in st.session_state.messages:
             if "text" in message:
                 st.markdown(message["text"])
             try:
-                image_data = base64.b64decode(message["content"])
-                st.image(BytesIO(image_data), caption=message.get("caption", ""), use_column_width=True)
+                st.image(get_image_bytes(message), caption=message.get("caption", ""), use_column_width=True)
             except Exception as e:
                 st.error(f"이미지 표시 오류: {str(e)}")
 
@@ -237,18 +290,19 @@ def send_message(session_id, prompt):
         }
         
         with st.spinner("응답을 생성하는 중..."):
-            response = requests.post(f"{api_base_url}/chat/sessions/{session_id}/messages", json=data)
+            response = get_http_session().post(f"{api_base_url}/chat/sessions/{session_id}/messages", json=data)
         
         if response.status_code == 200:
-            response_data = response.json()
+            response_data = parse_json_response(response)
             
-            # 응답 데이터 로깅
-            logger.info(f"백엔드 응답: {json.dumps(response_data, ensure_ascii=False)}...")
+            # 응답 데이터 로깅 (이미지 base64가 포함될 수 있으므로 DEBUG일 때만 전체를 직렬화)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"백엔드 응답: {json.dumps(response_data, ensure_ascii=False)}...")
             logger.info(f"응답 타입: {type(response_data)}, 배열인 경우 길이: {len(response_data) if isinstance(response_data, dict) else 'N/A'}")
             
             # 응답이 배열인지 단일 메시지인지 확인
             if isinstance(response_data, list):
-                logger.info(f"응답 데이터: {response_data}")
+                logger.debug("응답 데이터: %s", response_data)
                 # 배열 응답 처리 (여러 메시지)
                 logger.info(f"여러 메시지 처리: {len(response_data)}개 메시지")
                 for i, message_data in enumerate(response_data):
@@ -302,8 +356,7 @@ def process_message(message_data):
         # 이미지 응답 처리
         with st.chat_message("assistant"):
             try:
-                image_data = base64.b64decode(message_data["content"])
-                st.image(BytesIO(image_data), caption=message_data.get("caption", ""), use_column_width=True)
+                st.image(get_image_bytes(message_data), caption=message_data.get("caption", ""), use_column_width=True)
             except Exception as e:
                 logger.error(f"이미지 디코딩 오류: {str(e)}")
                 st.error(f"이미지 표시 오류: {str(e)}")
@@ -1,6 +1,6 @@
 from mcp.server.fastmcp import FastMCP
 import os
-import requests
+import httpx
 import json
 import logging
 from typing import List, Dict, Any, Optional
@@ -41,6 +41,16 @@ def get_github_headers():
         "X-GitHub-Api-Version": "2022-11-28"
     }
 
+# GitHub API 클라이언트
+# (비동기 도구에서 이벤트 루프를 막지 않고, 요청마다 TCP/TLS 연결을 새로 맺지 않도록 모듈 전체에서 재사용)
+github_client = httpx.AsyncClient(
+    headers=get_github_headers(),
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=8),
+    # 이름이 바뀌거나 이전된 저장소는 301로 응답하므로 requests처럼 리다이렉트를 따라감
+    follow_redirects=True,
+)
+
 # GitHub API 요청 함수
 async def github_api_request(endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict:
     """GitHub API에 요청을 보내는 함수"""
@@ -48,12 +58,10 @@ async def github_api_request(endpoint: str, method: str = "GET", data: Optional[
     logger.info(f"GitHub API 요청: {method} {url}")
     
     try:
-        headers = get_github_headers()
-        
         if method.upper() == "GET":
-            response = requests.get(url, headers=headers)
+            response = await github_client.get(url)
         elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data)
+            response = await github_client.post(url, json=data)
         else:
             return {"error": f"지원하지 않는 HTTP 메서드: {method}"}
         
@@ -2,9 +2,15 @@ from mcp.server.fastmcp import FastMCP
 import logging
 from typing import Dict, Any, Optional, List
 import time
+import asyncio
 import requests
-import base64
+from requests.adapters import HTTPAdapter
 import os
+try:
+    # SIMD 가속 base64 구현 (대용량 PNG 인코딩용)
+    import pybase64 as base64
+except ImportError:
+    import base64
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
@@ -38,6 +44,12 @@ logger.info(f"API Key: {GRAFANA_API_KEY[:5]}...{GRAFANA_API_KEY[-5:] if GRAFANA_
 # FastMCP 서버 생성
 mcp = FastMCP("GrafanaDashboardServer")
 
+# Grafana 공용 HTTP 세션 (도구 호출마다 새 TCP 연결을 맺지 않도록 keep-alive 연결 재사용)
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+http_session.mount("http://", _http_adapter)
+http_session.mount("https://", _http_adapter)
+
 def get_grafana_headers():
     """Grafana API 요청에 사용할 헤더를 반환합니다."""
     if GRAFANA_API_KEY:
@@ -61,7 +73,7 @@ def list_datasources() -> List[Dict[str, Any]]:
     url = f"{GRAFANA_URL}/api/datasources"
     
     try:
-        response = requests.get(url, headers=get_grafana_headers())
+        response = http_session.get(url, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -92,7 +104,7 @@ def get_datasource(id_or_name: str) -> Dict[str, Any]:
         url = f"{GRAFANA_URL}/api/datasources/name/{quote_plus(id_or_name)}"
     
     try:
-        response = requests.get(url, headers=get_grafana_headers())
+        response = http_session.get(url, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -126,7 +138,7 @@ def test_datasource(id_or_name: str) -> Dict[str, Any]:
     url = f"{GRAFANA_URL}/api/datasources/{datasource.get('id')}/health"
     
     try:
-        response = requests.get(url, headers=get_grafana_headers())
+        response = http_session.get(url, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -166,7 +178,7 @@ def list_dashboards(folder_id: Optional[int] = None, query: Optional[str] = None
     params["type"] = "dash-db"
     
     try:
-        response = requests.get(url, params=params, headers=get_grafana_headers())
+        response = http_session.get(url, params=params, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -193,7 +205,7 @@ def get_dashboard(uid: str) -> Dict[str, Any]:
     url = f"{GRAFANA_URL}/api/dashboards/uid/{uid}"
     
     try:
-        response = requests.get(url, headers=get_grafana_headers())
+        response = http_session.get(url, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -295,7 +307,7 @@ def get_panel_data(dashboard_uid: str, panel_id: int, time_range: Dict[str, str]
     }
     
     try:
-        response = requests.post(url, json=request_data, headers=get_grafana_headers())
+        response = http_session.post(url, json=request_data, headers=get_grafana_headers())
         
         if response.status_code == 200:
             return response.json()
@@ -309,8 +321,16 @@ def get_panel_data(dashboard_uid: str, panel_id: int, time_range: Dict[str, str]
 
 # 스크린샷 도구
 
+def fetch_rendered_png(url: str, params: Dict[str, Any]):
+    """Grafana 렌더링 요청 후 (응답, base64 PNG) 반환. 실패 시 PNG는 빈 문자열"""
+    response = http_session.get(url, params=params, headers=get_grafana_headers())
+    if response.status_code != 200:
+        return response, ""
+    # PNG 데이터를 Base64로 인코딩
+    return response, base64.b64encode(response.content).decode('utf-8')
+
 @mcp.tool()
-def render_dashboard(dashboard_uid: str, time_range: Dict[str, str], width: int = 1000, height: int = 500, theme: str = "light") -> str:
+async def render_dashboard(dashboard_uid: str, time_range: Dict[str, str], width: int = 1000, height: int = 500, theme: str = "light") -> str:
     """대시보드 이미지를 렌더링합니다.
     
     Args:
@@ -339,12 +359,11 @@ def render_dashboard(dashboard_uid: str, time_range: Dict[str, str], width: int
     try:
         # Grafana에 HTTP 요청
         logger.info(f"Grafana 렌더링 요청 전송: {url}")
-        response = requests.get(url, params=params, headers=get_grafana_headers())
+        # 렌더링 대기와 인코딩이 이벤트 루프를 막지 않도록 워커 스레드에서 실행
+        response, png_base64 = await asyncio.to_thread(fetch_rendered_png, url, params)
         
         # 응답 확인
         if response.status_code == 200:
-            # PNG 데이터를 Base64로 인코딩
-            png_base64 = base64.b64encode(response.content).decode('utf-8')
             return png_base64
         else:
             logger.error(f"대시보드 렌더링 실패: HTTP {response.status_code}, {response.text}")
@@ -355,7 +374,7 @@ def render_dashboard(dashboard_uid: str, time_range: Dict[str, str], width: int
         return ""
 
 @mcp.tool()
-def render_panel(dashboard_uid: str, panel_id: int, time_range: Dict[str, str], width: int = 500, height: int = 300, theme: str = "light") -> str:
+async def render_panel(dashboard_uid: str, panel_id: int, time_range: Dict[str, str], width: int = 500, height: int = 300, theme: str = "light") -> str:
     """패널 이미지를 렌더링합니다.
     
     Args:
@@ -386,12 +405,11 @@ def render_panel(dashboard_uid: str, panel_id: int, time_range: Dict[str, str],
     try:
         # Grafana에 HTTP 요청
         logger.info(f"Grafana 패널 렌더링 요청 전송: {url}")
-        response = requests.get(url, params=params, headers=get_grafana_headers())
+        # 렌더링 대기와 인코딩이 이벤트 루프를 막지 않도록 워커 스레드에서 실행
+        response, png_base64 = await asyncio.to_thread(fetch_rendered_png, url, params)
         
         # 응답 확인
         if response.status_code == 200:
-            # PNG 데이터를 Base64로 인코딩
-            png_base64 = base64.b64encode(response.content).decode('utf-8')
             return png_base64
         else:
             logger.error(f"패널 렌더링 실패: HTTP {response.status_code}, {response.text}")
@@ -320,11 +320,14 @@ async def check_environment() -> Dict:
         "K6_SCRIPTS_PATH": K6_SCRIPTS_PATH
     }
     
-    # 스크립트 디렉토리 확인
-    scripts_exist = os.path.exists(K6_SCRIPTS_PATH)
+    # 스크립트 디렉토리 확인 (scandir 한 번으로 존재 여부와 파일 목록을 함께 확인)
     script_files = []
-    if scripts_exist:
-        script_files = [f for f in os.listdir(K6_SCRIPTS_PATH) if f.endswith('.js')]
+    try:
+        with os.scandir(K6_SCRIPTS_PATH) as entries:
+            script_files = [entry.name for entry in entries if entry.name.endswith('.js') and entry.is_file()]
+        scripts_exist = True
+    except FileNotFoundError:
+        scripts_exist = False
     
     # 도커 상태 확인
     try:
@@ -626,23 +629,20 @@ async def run_load_test(
         "payload": payload or {},
     })
     
-    script_path = f"/tmp/{test_id}.js"
-    with open(script_path, "w") as f:
-        f.write(script)
-    
     try:
         # Docker 컨테이너에서 실행
+        # (스크립트를 임시 파일로 썼다가 마운트하지 않고 stdin으로 바로 전달 - k6 run -)
         docker_cmd = (
-            f"docker run --rm --network={DOCKER_NETWORK} "
+            f"docker run -i --rm --network={DOCKER_NETWORK} "
             f"--name k6-load-test-{test_id} "
-            f"-v {script_path}:/scripts/load-test.js "
-            f"grafana/k6:latest run /scripts/load-test.js"
+            f"grafana/k6:latest run -"
         )
         
         result = subprocess.run(
             docker_cmd,
             shell=True,
             check=True,
+            input=script,
             capture_output=True,
             text=True
         )
@@ -674,8 +674,6 @@ async def run_load_test(
             "endpoint": endpoint,
             "error": e.stderr
         }
-    finally:
-        os.remove(script_path)
 
 @mcp.tool()
 async def get_test_results(test_id: str) -> Dict:
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any
+import asyncio
 import subprocess
 import json
 import os
@@ -11,6 +12,9 @@ import uuid
 import logging
 import sys
 
+# kubectl 결과 전체를 pretty-print한 JSON 덤프는 호출마다 비용이 크므로 LOG_KUBECTL_DUMPS=true일 때만 남김
+LOG_KUBECTL_DUMPS = os.environ.get("LOG_KUBECTL_DUMPS", "false").lower() == "true"
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.DEBUG,
@@ -27,22 +31,10 @@ root_logger = logging.getLogger()
 root_logger.setLevel(logging.DEBUG)
 
 # MCP 서버 로거 설정
+# (핸들러는 위 basicConfig의 루트 로거 것을 그대로 사용. 여기서 따로 추가하면 모든 로그가 두 번 출력/기록됨)
 logger = logging.getLogger('mcp_server')
 logger.setLevel(logging.DEBUG)
 
-# 로그 핸들러 추가
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s() - %(message)s')
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
-
-# 파일 핸들러 추가
-file_handler = logging.FileHandler('mcp_server.log', encoding='utf-8', mode='w')
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
 logger.info("="*50)
 logger.info("MCP 서버 시작")
 logger.info("="*50)
@@ -191,8 +183,14 @@ def start_kubectl_proxy():
             return False
             
         # Kill any existing kubectl proxy process
-        subprocess.run(["pkill", "-f", "kubectl proxy"], capture_output=True)
-        time.sleep(1)  # Wait for process to be killed
+        kill_result = subprocess.run(["pkill", "-f", "kubectl proxy"], capture_output=True)
+        if kill_result.returncode == 0:
+            # Wait (up to 1 second) only until the old process has actually exited
+            kill_deadline = time.time() + 1
+            while time.time() < kill_deadline:
+                if subprocess.run(["pgrep", "-f", "kubectl proxy"], capture_output=True).returncode != 0:
+                    break
+                time.sleep(0.1)
         
         # Start new kubectl proxy with timeout
         proxy_process = subprocess.Popen(
@@ -204,6 +202,10 @@ def start_kubectl_proxy():
         # Wait for proxy to start with timeout
         start_time = time.time()
         while time.time() - start_time < 5:  # 5 second timeout
+            # Stop waiting right away if the proxy process already exited
+            if proxy_process.poll() is not None:
+                logger.error(f"kubectl proxy exited early with code {proxy_process.returncode}")
+                return False
             try:
                 result = subprocess.run(
                     ["curl", "-s", "http://localhost:8002/version"],
@@ -216,7 +218,8 @@ def start_kubectl_proxy():
                     return True
             except subprocess.TimeoutExpired:
                 pass
-            time.sleep(0.5)
+            # Poll at a short interval so a ready proxy is picked up almost immediately
+            time.sleep(0.1)
         
         # If we get here, proxy didn't start in time
         logger.error("Timeout waiting for kubectl proxy to start")
@@ -276,19 +279,23 @@ async def get_services():
 async def get_status():
     logger.info("Checking status of all services...")
     # Get status of all services
+    # The process list is the same for every service, so run `ps aux` once
+    # (off the event loop) instead of once per service
     status = {}
+    try:
+        result = await asyncio.to_thread(
+            subprocess.run,
+            ["ps", "aux"],
+            capture_output=True,
+            text=True
+        )
+        process_list = result.stdout
+    except Exception as e:
+        logger.error(f"Error checking service status: {str(e)}")
+        process_list = None
     for service in ["k6", "github", "grafana", "argocd"]:
-        try:
-            result = subprocess.run(
-                ["ps", "aux"],
-                capture_output=True,
-                text=True
-            )
-            status[service] = service in result.stdout
-            logger.info(f"Service {service} status: {status[service]}")
-        except Exception as e:
-            logger.error(f"Error checking service status: {str(e)}")
-            status[service] = False
+        status[service] = process_list is not None and service in process_list
+        logger.info(f"Service {service} status: {status[service]}")
     return status
 
 # Kubernetes API endpoints
@@ -313,7 +320,8 @@ async def list_nodes():
         
         logger.info("[Kubernetes] 노드 정보 파싱 중...")
         nodes_data = json.loads(result.stdout)
-        logger.info(f"[Kubernetes] 원본 노드 데이터: {json.dumps(nodes_data, indent=2, ensure_ascii=False)}")
+        if LOG_KUBECTL_DUMPS:
+            logger.debug(f"[Kubernetes] 원본 노드 데이터: {json.dumps(nodes_data, indent=2, ensure_ascii=False)}")
         
         nodes = []
         for node in nodes_data.get("items", []):
@@ -348,7 +356,8 @@ async def list_nodes():
                 ]
             }
             nodes.append(node_info)
-            logger.info(f"[Kubernetes] 노드 정보 추가 완료: {json.dumps(node_info, indent=2, ensure_ascii=False)}")
+            if LOG_KUBECTL_DUMPS:
+                logger.debug(f"[Kubernetes] 노드 정보 추가 완료: {json.dumps(node_info, indent=2, ensure_ascii=False)}")
         
         # 노드 상태 통계 계산
         total_nodes = len(nodes)
@@ -422,7 +431,8 @@ async def list_pods():
         
         logger.info("[Kubernetes] 파드 정보 파싱 중...")
         pods_data = json.loads(result.stdout)
-        logger.info(f"[Kubernetes] 원본 파드 데이터: {json.dumps(pods_data, indent=2, ensure_ascii=False)}")
+        if LOG_KUBECTL_DUMPS:
+            logger.debug(f"[Kubernetes] 원본 파드 데이터: {json.dumps(pods_data, indent=2, ensure_ascii=False)}")
         
         pods = []
         for pod in pods_data.get("items", []):
@@ -471,7 +481,8 @@ async def list_pods():
                 "creation_timestamp": creation_timestamp
             }
             pods.append(pod_info)
-            logger.info(f"[Kubernetes] 파드 정보 추가 완료: {json.dumps(pod_info, indent=2, ensure_ascii=False)}")
+            if LOG_KUBECTL_DUMPS:
+                logger.debug(f"[Kubernetes] 파드 정보 추가 완료: {json.dumps(pod_info, indent=2, ensure_ascii=False)}")
         
         # 파드 상태 통계 계산
         status_stats = {}
@@ -520,7 +531,8 @@ async def list_services():
         
         logger.info("[Kubernetes] 서비스 정보 파싱 중...")
         services_data = json.loads(result.stdout)
-        logger.info(f"[Kubernetes] 원본 서비스 데이터: {json.dumps(services_data, indent=2, ensure_ascii=False)}")
+        if LOG_KUBECTL_DUMPS:
+            logger.debug(f"[Kubernetes] 원본 서비스 데이터: {json.dumps(services_data, indent=2, ensure_ascii=False)}")
         
         services = []
         for service in services_data.get("items", []):
@@ -536,7 +548,8 @@ async def list_services():
                 "age": service["metadata"]["creationTimestamp"]
             }
             services.append(service_info)
-            logger.info(f"[Kubernetes] 서비스 정보 추가 완료: {json.dumps(service_info, indent=2, ensure_ascii=False)}")
+            if LOG_KUBECTL_DUMPS:
+                logger.debug(f"[Kubernetes] 서비스 정보 추가 완료: {json.dumps(service_info, indent=2, ensure_ascii=False)}")
         
         logger.info(f"[Kubernetes] 총 {len(services)}개 서비스 처리 완료")
         logger.info(f"[Kubernetes] 서비스 유형별 통계:")
@@ -1,7 +1,9 @@
 # loki_tempo_mcp_server.py
 from typing import List, Dict, Optional, Any
 import os
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 from datetime import datetime, timedelta
@@ -215,6 +217,13 @@ def parse_time_range(time_range: str) -> tuple:
         end_ns = int(now.timestamp() * 1_000_000_000)
         return start_ns, end_ns
 
+# Loki/Tempo 공용 HTTP 세션 (요청마다 새 TCP 연결을 맺지 않도록 keep-alive 연결 재사용)
+# correlate가 최대 5개 trace를 동시에 조회하므로 풀 크기를 그보다 크게 설정
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+http_session.mount("http://", _http_adapter)
+http_session.mount("https://", _http_adapter)
+
 # HTTP 요청 헬퍼 함수
 def make_request(url: str, method: str = "GET", params: Dict = None, 
                 headers: Dict = None, auth_user: str = None, auth_password: str = None) -> Dict:
@@ -244,9 +253,9 @@ def make_request(url: str, method: str = "GET", params: Dict = None,
         
         # 요청 실행
         if method == "GET":
-            response = requests.get(url, params=params, headers=headers, auth=auth, timeout=30)
+            response = http_session.get(url, params=params, headers=headers, auth=auth, timeout=30)
         else:
-            response = requests.request(method, url, params=params, headers=headers, auth=auth, timeout=30)
+            response = http_session.request(method, url, params=params, headers=headers, auth=auth, timeout=30)
         
         response.raise_for_status()
         
@@ -399,19 +408,24 @@ async def check_environment() -> Dict:
         "TEMPO_AUTH_PASSWORD": "***masked***" if TEMPO_AUTH_PASSWORD else None
     }
     
-    # Loki 연결 상태 확인
-    try:
-        loki_ready = make_request(f"{LOKI_URL}/ready", auth_user=LOKI_AUTH_USER, auth_password=LOKI_AUTH_PASSWORD)
+    # Loki/Tempo 연결 상태를 동시에 확인 (한쪽이 응답하지 않아도 다른 쪽 확인이 밀리지 않도록)
+    loki_ready, tempo_ready = await asyncio.gather(
+        asyncio.to_thread(make_request, f"{LOKI_URL}/ready", auth_user=LOKI_AUTH_USER, auth_password=LOKI_AUTH_PASSWORD),
+        asyncio.to_thread(make_request, f"{TEMPO_URL}/status", auth_user=TEMPO_AUTH_USER, auth_password=TEMPO_AUTH_PASSWORD),
+        return_exceptions=True
+    )
+    
+    # Loki 연결 상태
+    if isinstance(loki_ready, Exception):
+        loki_status = f"연결 실패: {str(loki_ready)}"
+    else:
         loki_status = "연결됨" if not loki_ready.get("error") else f"오류: {loki_ready.get('error')}"
-    except Exception as e:
-        loki_status = f"연결 실패: {str(e)}"
     
-    # Tempo 연결 상태 확인
-    try:
-        tempo_ready = make_request(f"{TEMPO_URL}/status", auth_user=TEMPO_AUTH_USER, auth_password=TEMPO_AUTH_PASSWORD)
+    # Tempo 연결 상태
+    if isinstance(tempo_ready, Exception):
+        tempo_status = f"연결 실패: {str(tempo_ready)}"
+    else:
         tempo_status = "연결됨" if not tempo_ready.get("error") else f"오류: {tempo_ready.get('error')}"
-    except Exception as e:
-        tempo_status = f"연결 실패: {str(e)}"
     
     return {
         "환경 변수": env_vars,
@@ -674,7 +688,9 @@ async def get_trace_details(trace_id: str) -> Dict:
     """
     # Tempo API 호출
     logger.info(f"트레이스 상세 조회: {trace_id}")
-    result = make_request(
+    # 블로킹 HTTP 요청은 스레드에서 실행하여 여러 트레이스 조회가 동시에 진행될 수 있게 함
+    result = await asyncio.to_thread(
+        make_request,
         f"{TEMPO_URL}/api/traces/{trace_id}",
         auth_user=TEMPO_AUTH_USER,
         auth_password=TEMPO_AUTH_PASSWORD
@@ -1058,7 +1074,8 @@ async def correlate_logs_and_traces(
             "limit": 1000
         }
         
-        log_result = make_request(
+        log_result = await asyncio.to_thread(
+            make_request,
             f"{LOKI_URL}/loki/api/v1/query_range",
             params=log_params,
             auth_user=LOKI_AUTH_USER,
@@ -1097,14 +1114,17 @@ async def correlate_logs_and_traces(
         )
         
         if traces_result.get("status") == "success" and traces_result.get("traces"):
-            for trace in traces_result["traces"][:5]:  # 처음 5개 트레이스만
-                # 각 트레이스에 대한 로그 찾기
-                correlation = await correlate_logs_and_traces(
+            # 각 트레이스에 대한 로그 찾기를 순차 호출 대신 동시에 실행 (처음 5개 트레이스만)
+            correlations = await asyncio.gather(*(
+                correlate_logs_and_traces(
                     trace_id=trace["trace_id"],
                     time_window=time_window,
                     service=service
                 )
-                
+                for trace in traces_result["traces"][:5]
+            ))
+            
+            for correlation in correlations:
                 if correlation.get("status") == "success" and correlation.get("correlations"):
                     results["correlations"].extend(correlation["correlations"])
     
@@ -1226,6 +1246,12 @@ async def export_data(
         try:
             with open(output_file, 'w') as f:
                 f.write(export_data)
+                # 내보낸 파일은 이 프로세스에서 다시 읽지 않으므로 페이지 캐시에서 내리도록 커널에 알림
+                # (DONTNEED는 깨끗한 페이지만 버리므로 먼저 디스크에 기록해야 효과가 있음)
+                if hasattr(os, "posix_fadvise"):
+                    f.flush()
+                    os.fdatasync(f.fileno())
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
             
             return {
                 "status": "success",
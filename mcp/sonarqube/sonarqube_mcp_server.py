@@ -3,6 +3,7 @@ import logging
 from typing import Dict, Any, Optional, List
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import os
 from dotenv import load_dotenv
 
@@ -32,6 +33,12 @@ logger.info(f"API Token: {SONARQUBE_TOKEN[:5]}...{SONARQUBE_TOKEN[-5:] if SONARQ
 # FastMCP 서버 생성
 mcp = FastMCP("SonarQubeServer")
 
+# SonarQube 공용 HTTP 세션 (도구 호출마다 새 TCP 연결을 맺지 않도록 keep-alive 연결 재사용)
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+http_session.mount("http://", _http_adapter)
+http_session.mount("https://", _http_adapter)
+
 def get_sonarqube_auth():
     """SonarQube API 요청에 사용할 인증 정보를 반환합니다."""
     if SONARQUBE_TOKEN:
@@ -44,6 +51,31 @@ def get_headers():
         "Content-Type": "application/json"
     }
 
+def sonarqube_get(url: str, action: str, params: Optional[Dict[str, Any]] = None, as_json: bool = True):
+    """SonarQube API에 GET 요청을 보내고 공통 오류 처리를 수행합니다.
+    
+    Args:
+        url: 요청 URL
+        action: 로그/오류 메시지에 사용할 작업 이름 (예: "프로젝트 목록 가져오기")
+        params: 쿼리 파라미터
+        as_json: True면 JSON으로 파싱한 결과를, False면 응답 텍스트를 반환
+        
+    Returns:
+        tuple: (응답 데이터, 오류 메시지) - 성공 시 오류 메시지는 None, 실패 시 응답 데이터는 None
+    """
+    try:
+        response = http_session.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
+        
+        if response.status_code == 200:
+            return (response.json() if as_json else response.text), None
+        else:
+            logger.error(f"{action} 실패: HTTP {response.status_code}, {response.text}")
+            return None, f"{action} 실패: HTTP {response.status_code}"
+    
+    except Exception as e:
+        logger.error(f"{action} 오류: {str(e)}")
+        return None, f"{action} 오류: {str(e)}"
+
 # 프로젝트 관련 도구
 
 @mcp.tool()
@@ -57,18 +89,11 @@ def list_projects() -> List[Dict[str, Any]]:
 
     url = f"{SONARQUBE_URL}/api/projects/search"
     
-    try:
-        response = requests.get(url, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            return response.json().get('components', [])
-        else:
-            logger.error(f"프로젝트 목록 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return []
-    
-    except Exception as e:
-        logger.error(f"프로젝트 목록 가져오기 오류: {str(e)}")
+    data, error = sonarqube_get(url, "프로젝트 목록 가져오기")
+    if error:
         return []
+    
+    return data.get('components', [])
 
 @mcp.tool()
 def get_project(project_key: str) -> Dict[str, Any]:
@@ -85,22 +110,15 @@ def get_project(project_key: str) -> Dict[str, Any]:
     url = f"{SONARQUBE_URL}/api/projects/search"
     params = {"projects": project_key}
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            components = response.json().get('components', [])
-            if components:
-                return components[0]
-            else:
-                return {"error": "프로젝트를 찾을 수 없습니다."}
-        else:
-            logger.error(f"프로젝트 정보 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"프로젝트 정보 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "프로젝트 정보 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"프로젝트 정보 가져오기 오류: {str(e)}")
-        return {"error": f"프로젝트 정보 가져오기 오류: {str(e)}"}
+    components = data.get('components', [])
+    if components:
+        return components[0]
+    else:
+        return {"error": "프로젝트를 찾을 수 없습니다."}
 
 # 품질 게이트 관련 도구
 
@@ -119,18 +137,11 @@ def get_quality_gate_status(project_key: str) -> Dict[str, Any]:
     url = f"{SONARQUBE_URL}/api/qualitygates/project_status"
     params = {"projectKey": project_key}
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            return response.json().get('projectStatus', {})
-        else:
-            logger.error(f"품질 게이트 상태 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"품질 게이트 상태 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "품질 게이트 상태 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"품질 게이트 상태 가져오기 오류: {str(e)}")
-        return {"error": f"품질 게이트 상태 가져오기 오류: {str(e)}"}
+    return data.get('projectStatus', {})
 
 # 이슈 관련 도구
 
@@ -169,24 +180,16 @@ def get_project_issues(project_key: str, issue_types: Optional[List[str]] = None
     if statuses:
         params["statuses"] = ",".join(statuses)
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "issues": data.get("issues", []),
-                "total": data.get("total", 0),
-                "p": data.get("p", 1),
-                "ps": data.get("ps", max_results)
-            }
-        else:
-            logger.error(f"이슈 목록 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"이슈 목록 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "이슈 목록 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"이슈 목록 가져오기 오류: {str(e)}")
-        return {"error": f"이슈 목록 가져오기 오류: {str(e)}"}
+    return {
+        "issues": data.get("issues", []),
+        "total": data.get("total", 0),
+        "p": data.get("p", 1),
+        "ps": data.get("ps", max_results)
+    }
 
 @mcp.tool()
 def get_issue_details(issue_key: str) -> Dict[str, Any]:
@@ -203,22 +206,15 @@ def get_issue_details(issue_key: str) -> Dict[str, Any]:
     url = f"{SONARQUBE_URL}/api/issues/search"
     params = {"issues": issue_key}
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            issues = response.json().get("issues", [])
-            if issues:
-                return issues[0]
-            else:
-                return {"error": "이슈를 찾을 수 없습니다."}
-        else:
-            logger.error(f"이슈 상세 정보 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"이슈 상세 정보 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "이슈 상세 정보 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"이슈 상세 정보 가져오기 오류: {str(e)}")
-        return {"error": f"이슈 상세 정보 가져오기 오류: {str(e)}"}
+    issues = data.get("issues", [])
+    if issues:
+        return issues[0]
+    else:
+        return {"error": "이슈를 찾을 수 없습니다."}
 
 # 메트릭 관련 도구
 
@@ -241,23 +237,16 @@ def get_project_metrics(project_key: str, metrics: List[str]) -> Dict[str, Any]:
         "metricKeys": ",".join(metrics)
     }
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            component = response.json().get("component", {})
-            return {
-                "component": component.get("key"),
-                "name": component.get("name"),
-                "measures": component.get("measures", [])
-            }
-        else:
-            logger.error(f"메트릭 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"메트릭 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "메트릭 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"메트릭 가져오기 오류: {str(e)}")
-        return {"error": f"메트릭 가져오기 오류: {str(e)}"}
+    component = data.get("component", {})
+    return {
+        "component": component.get("key"),
+        "name": component.get("name"),
+        "measures": component.get("measures", [])
+    }
 
 @mcp.tool()
 def list_metrics() -> List[Dict[str, Any]]:
@@ -271,18 +260,11 @@ def list_metrics() -> List[Dict[str, Any]]:
     url = f"{SONARQUBE_URL}/api/metrics/search"
     params = {"ps": 500}  # 최대 개수 설정
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            return response.json().get("metrics", [])
-        else:
-            logger.error(f"메트릭 목록 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return []
-    
-    except Exception as e:
-        logger.error(f"메트릭 목록 가져오기 오류: {str(e)}")
+    data, error = sonarqube_get(url, "메트릭 목록 가져오기", params=params)
+    if error:
         return []
+    
+    return data.get("metrics", [])
 
 # 구성요소 관련 도구
 
@@ -312,22 +294,14 @@ def get_project_components(project_key: str, qualifiers: Optional[List[str]] = N
     if qualifiers:
         params["qualifiers"] = ",".join(qualifiers)
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "components": data.get("components", []),
-                "paging": data.get("paging", {})
-            }
-        else:
-            logger.error(f"구성요소 목록 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"구성요소 목록 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "구성요소 목록 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"구성요소 목록 가져오기 오류: {str(e)}")
-        return {"error": f"구성요소 목록 가져오기 오류: {str(e)}"}
+    return {
+        "components": data.get("components", []),
+        "paging": data.get("paging", {})
+    }
 
 # 규칙 관련 도구
 
@@ -359,24 +333,16 @@ def get_rules(languages: Optional[List[str]] = None, severities: Optional[List[s
     if severities:
         params["severities"] = ",".join(severities)
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "rules": data.get("rules", []),
-                "total": data.get("total", 0),
-                "p": data.get("p", 1),
-                "ps": data.get("ps", max_results)
-            }
-        else:
-            logger.error(f"규칙 목록 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"규칙 목록 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "규칙 목록 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"규칙 목록 가져오기 오류: {str(e)}")
-        return {"error": f"규칙 목록 가져오기 오류: {str(e)}"}
+    return {
+        "rules": data.get("rules", []),
+        "total": data.get("total", 0),
+        "p": data.get("p", 1),
+        "ps": data.get("ps", max_results)
+    }
 
 @mcp.tool()
 def get_rule_details(rule_key: str) -> Dict[str, Any]:
@@ -393,18 +359,11 @@ def get_rule_details(rule_key: str) -> Dict[str, Any]:
     url = f"{SONARQUBE_URL}/api/rules/show"
     params = {"key": rule_key}
     
-    try:
-        response = requests.get(url, params=params, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            return response.json().get("rule", {})
-        else:
-            logger.error(f"규칙 상세 정보 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"규칙 상세 정보 가져오기 실패: HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "규칙 상세 정보 가져오기", params=params)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"규칙 상세 정보 가져오기 오류: {str(e)}")
-        return {"error": f"규칙 상세 정보 가져오기 오류: {str(e)}"}
+    return data.get("rule", {})
 
 # 유틸리티 도구
 
@@ -419,22 +378,15 @@ def get_server_version() -> Dict[str, Any]:
     
     url = f"{SONARQUBE_URL}/api/server/version"
     
-    try:
-        response = requests.get(url, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            version = response.text.strip()
-            return {
-                "version": version,
-                "uptime": time.time() - start_time
-            }
-        else:
-            logger.error(f"서버 버전 가져오기 실패: HTTP {response.status_code}, {response.text}")
-            return {"error": f"서버 버전 가져오기 실패: HTTP {response.status_code}"}
+    text, error = sonarqube_get(url, "서버 버전 가져오기", as_json=False)
+    if error:
+        return {"error": error}
     
-    except Exception as e:
-        logger.error(f"서버 버전 가져오기 오류: {str(e)}")
-        return {"error": f"서버 버전 가져오기 오류: {str(e)}"}
+    version = text.strip()
+    return {
+        "version": version,
+        "uptime": time.time() - start_time
+    }
 
 @mcp.tool()
 def get_server_health() -> Dict[str, str]:
@@ -447,18 +399,11 @@ def get_server_health() -> Dict[str, str]:
     
     url = f"{SONARQUBE_URL}/api/system/health"
     
-    try:
-        response = requests.get(url, headers=get_headers(), auth=get_sonarqube_auth())
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"서버 상태 확인 실패: HTTP {response.status_code}, {response.text}")
-            return {"health": "RED", "error": f"HTTP {response.status_code}"}
+    data, error = sonarqube_get(url, "서버 상태 확인")
+    if error:
+        return {"health": "RED", "error": error}
     
-    except Exception as e:
-        logger.error(f"서버 상태 확인 오류: {str(e)}")
-        return {"health": "RED", "error": str(e)}
+    return data
 
 if __name__ == "__main__":
     # HTTP 모드로 서버 실행